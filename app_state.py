@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from enum import IntEnum
+from constants import *
+
+class State(IntEnum):
+    WAITING_START = 0
+    WAITING_END = 1
+    READY = 2
+    PATHFINDING = 3
+
+@dataclass(slots=True)
+class AppState:
+    state: State = State.WAITING_START
+    wall_type: str = "maze"
+    speed: float = NORMAL_SPEED
+    last_path_length: int = 0
+    # Mirrored from PathfindingManager every frame
+    is_pathfinding_in_progress: bool = False
+    pathfinding_paused: bool = False
+    pathfinding_completed: bool = False
+    path_found: bool = False
+    # Derived state
+    can_interact_with_grid: bool = True
+    can_start_pathfinding: bool = False
@@ -7,6 +7,17 @@ CELL_SIZE = 12
 GRID_ROWS = WINDOW_HEIGHT // CELL_SIZE
 GRID_COLS = (WINDOW_WIDTH - 250) // CELL_SIZE  # Wider button panel for more features
 
+# Pixel extent of the grid area
+GRID_PIXELS_W = GRID_COLS * CELL_SIZE
+GRID_PIXELS_H = GRID_ROWS * CELL_SIZE
+
+# Control panel to the right of the grid
+UI_PANEL_X = GRID_PIXELS_W
+UI_PANEL_WIDTH = WINDOW_WIDTH - GRID_PIXELS_W
+
+# Dirty area (in pixels) above which the whole window is flipped instead
+FULL_FLIP_AREA = WINDOW_WIDTH * WINDOW_HEIGHT * 0.6
+
 # Modern Dark Theme
 # Background and UI
 BG_DARK = (60, 64, 72)             # Dark background
@@ -28,6 +39,16 @@ NODE_CURRENT = (187, 134, 252)     # Current node
 NODE_NEIGHBOR = (77, 208, 225)     # Neighbor nodes
 NODE_DEFAULT = (30, 32, 40)        # Default node color
 
+# Cell states stored in Grid.state (each indexes into STATE_COLORS)
+STATE_DEFAULT = 0
+STATE_WALL = 1
+STATE_START = 2
+STATE_END = 3
+STATE_VISITED = 4
+STATE_NEIGHBOR = 5
+STATE_PATH = 6
+STATE_COLORS = (NODE_DEFAULT, WALL, NODE_START, NODE_END, NODE_VISITED, NODE_NEIGHBOR, NODE_PATH)
+
 # UI Elements
 BUTTON_NORMAL = (60, 64, 72)       # Normal button (darker gray)
 BUTTON_HOVER = (80, 84, 92)        # Button hover state (slightly lighter)
@@ -50,4 +71,7 @@ BUTTON_MARGIN = 12
 INSTANT_SPEED = 0
 FAST_SPEED = 0.002
 NORMAL_SPEED = 0.01
-SLOW_SPEED = 0.05
\ No newline at end of file
+SLOW_SPEED = 0.05
+
+# Longest the main loop blocks waiting for input while idle (ms)
+IDLE_EVENT_TIMEOUT = 250
\ No newline at end of file
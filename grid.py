@@ -1,67 +1,161 @@
 from typing import List, Optional, Tuple
+import numpy as np
 import pygame
 from node import Node
 from constants import *
 
+# Above this many changed cells one full-surface blit_array beats per-cell rects.
+FULL_REDRAW_CELLS = 512
+
+# 4-way neighbor offsets as (row, col)
+_DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+def build_neighbor_csr(padded_walls: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # CSR adjacency over flat cell indices: the open neighbors of cell i are
+    # indices[offsets[i]:offsets[i + 1]]. The one-cell wall border of padded_walls
+    # makes every shifted probe in-bounds, so no edge cases are needed.
+    rows, cols = padded_walls.shape[0] - 2, padded_walls.shape[1] - 2
+    open_cells = ~padded_walls
+    flat_index = np.arange(rows * cols, dtype=np.int32).reshape(rows, cols)
+    table = np.empty((rows, cols, 4), dtype=np.int32)
+    for k, (dx, dy) in enumerate(_DIRECTIONS):
+        table[:, :, k] = np.where(open_cells[1 + dx:rows + 1 + dx, 1 + dy:cols + 1 + dy],
+                                  flat_index + (dx * cols + dy), -1)
+
+    valid = table >= 0
+    offsets = np.zeros(rows * cols + 1, dtype=np.int32)
+    np.cumsum(valid.sum(axis=2).ravel(), out=offsets[1:])
+    return offsets, table[valid]
+
 class Grid:
     def __init__(self):
-        self.grid: List[List[Node]] = []
+        self.rows: int = GRID_ROWS
+        self.cols: int = GRID_COLS
         self.start_node: Optional[Node] = None
         self.end_node: Optional[Node] = None
+        # Converted to the display format so the per-frame blit is a straight copy.
+        self._surface = pygame.Surface((GRID_PIXELS_W, GRID_PIXELS_H)).convert()
+        # State -> mapped pixel value for the cached surface's pixel format.
+        self._color_lut = np.array([self._surface.map_rgb(color) for color in STATE_COLORS],
+                                   dtype=np.uint32)
+        # One solid CELL_SIZE tile per state, so changed cells are painted with a single blits() call.
+        self._cell_surfaces = []
+        for color in STATE_COLORS:
+            tile = pygame.Surface((CELL_SIZE, CELL_SIZE)).convert()
+            tile.fill(color)
+            self._cell_surfaces.append(tile)
         self.initialize_grid()
 
     def initialize_grid(self) -> None:
-        self.grid = []
-        for row in range(GRID_ROWS):
-            self.grid.append([])
-            for col in range(GRID_COLS):
-                node = Node(row, col)
-                self.grid[row].append(node)
+        # Per-cell state is kept as parallel arrays; Node objects are only views onto them.
+        shape = (self.rows, self.cols)
+        self.state = np.full(shape, STATE_DEFAULT, dtype=np.uint8)
+        # Walls carry a permanent one-cell border so neighbor probes never go out of bounds;
+        # is_wall is the interior view and is what everything else reads and writes.
+        self._padded_walls = np.ones((self.rows + 2, self.cols + 2), dtype=bool)
+        self.is_wall = self._padded_walls[1:-1, 1:-1]
+        self.is_wall.fill(False)
+        self.previous = np.full(shape, -1, dtype=np.int32)
+        self.visited = np.zeros(shape, dtype=bool)
+        # Top-left pixel of every cell, so drawing never recomputes row/col * CELL_SIZE.
+        self._py, self._px = np.meshgrid(np.arange(self.rows, dtype=np.int32) * CELL_SIZE,
+                                         np.arange(self.cols, dtype=np.int32) * CELL_SIZE,
+                                         indexing='ij')
+        # State as last painted onto self._surface; 255 matches no state so the first draw paints every cell.
+        self._drawn_state = np.full(shape, 255, dtype=np.uint8)
+        self._neighbor_walls: Optional[np.ndarray] = None
+        # Wall edits from mouse drags, applied together by apply_pending_walls()
+        self._pending_walls: List[Tuple[int, int, bool]] = []
+        self.set_neighbors()
 
     def get_node(self, row: int, col: int) -> Optional[Node]:
-        if 0 <= row < GRID_ROWS and 0 <= col < GRID_COLS:
-            return self.grid[row][col]
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return Node(self, row, col)
         return None
 
     def set_neighbors(self) -> None:
-        for row_list in self.grid:
-            for node in row_list:
-                node.neighbors = []
-                directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-                for dx, dy in directions:
-                    new_row, new_col = node.row + dx, node.col + dy
-                    neighbor = self.get_node(new_row, new_col)
-                    if neighbor and not neighbor.is_wall:
-                        node.neighbors.append(neighbor)
-
-    def draw(self, window: pygame.Surface) -> None:
-        for row_list in self.grid:
-            for node in row_list:
-                pygame.draw.rect(window, node.color,
-                               (node.x, node.y, CELL_SIZE, CELL_SIZE))
+        # Walls are the only input, so skip the rebuild when they haven't changed since the last one.
+        if self._neighbor_walls is not None and np.array_equal(self._neighbor_walls, self.is_wall):
+            return
+        self._neighbor_walls = self.is_wall.copy()
+        self.neighbor_offsets, self.neighbor_indices = build_neighbor_csr(self._padded_walls)
+
+    def reset_cell(self, row: int, col: int) -> None:
+        self.state[row, col] = STATE_DEFAULT
+        self.is_wall[row, col] = False
+        self.previous[row, col] = -1
+        self.visited[row, col] = False
+
+    def queue_wall(self, row: int, col: int, wall: bool) -> None:
+        self._pending_walls.append((row, col, wall))
+
+    def apply_pending_walls(self) -> None:
+        if not self._pending_walls:
+            return
+        rows, cols, walls = (np.array(values) for values in zip(*self._pending_walls))
+        self._pending_walls.clear()
+        # A click later in the same frame may have placed start or end on a queued cell;
+        # those cells keep their role and drop the queued edit.
+        keep = np.ones(len(rows), dtype=bool)
+        for node in (self.start_node, self.end_node):
+            if node is not None:
+                keep &= (rows != node.row) | (cols != node.col)
+        rows, cols, walls = rows[keep], cols[keep], walls[keep]
+        self.is_wall[rows, cols] = walls
+        self.state[rows, cols] = np.where(walls, STATE_WALL, STATE_DEFAULT)
+        erased_rows, erased_cols = rows[~walls], cols[~walls]
+        self.previous[erased_rows, erased_cols] = -1
+        self.visited[erased_rows, erased_cols] = False
+
+    def reset_search(self) -> None:
+        self.previous.fill(-1)
+        self.visited.fill(False)
+
+    def draw(self, window: pygame.Surface) -> List[pygame.Rect]:
+        # Returns the window areas that changed, for pygame.display.update().
+        # Snapshot first: the pathfinding thread may keep writing while we paint.
+        state = self.state.copy()
+        changed = np.argwhere(state != self._drawn_state)
+        if len(changed) > FULL_REDRAW_CELLS:
+            # Expand every cell to CELL_SIZE x CELL_SIZE pixels through the color LUT in one pass.
+            pixels = self._color_lut[state.T].repeat(CELL_SIZE, axis=0).repeat(CELL_SIZE, axis=1)
+            pygame.surfarray.blit_array(self._surface, pixels)
+            dirty_rects = [self._surface.get_rect()]
+        else:
+            rows, cols = changed.T
+            xs, ys = self._px[rows, cols].tolist(), self._py[rows, cols].tolist()
+            cell_surfaces = self._cell_surfaces
+            self._surface.blits([(cell_surfaces[color_state], (x, y))
+                                 for color_state, x, y in zip(state[rows, cols].tolist(), xs, ys)],
+                                doreturn=False)
+            # Report horizontal runs of changed cells as one rect each; argwhere is row-major,
+            # so a run breaks wherever the row changes or the column skips.
+            breaks = np.flatnonzero((np.diff(rows) != 0) | (np.diff(cols) != 1)) + 1
+            starts = [0] + breaks.tolist()
+            ends = breaks.tolist() + [len(rows)]
+            dirty_rects = [pygame.Rect(xs[start], ys[start], (end - start) * CELL_SIZE, CELL_SIZE)
+                           for start, end in zip(starts, ends) if end > start]
+        self._drawn_state = state
+        # The window keeps last frame's pixels, so only the repainted areas are copied over.
+        window.blits([(self._surface, rect, rect) for rect in dirty_rects], doreturn=False)
+        return dirty_rects
 
     def clear_path(self) -> None:
-        for row_list in self.grid:
-            for node in row_list:
-                if not node.is_wall and node != self.start_node and node != self.end_node:
-                    node.reset()
+        mask = ((self.state != STATE_WALL) & (self.state != STATE_START) &
+                (self.state != STATE_END))
+        self.state[mask] = STATE_DEFAULT
+        self.reset_search()
 
     def clear_all(self) -> None:
-        for row_list in self.grid:
-            for node in row_list:
-                node.reset()
+        self._pending_walls.clear()
+        self.state.fill(STATE_DEFAULT)
+        self.is_wall.fill(False)
+        self.reset_search()
         self.start_node = None
         self.end_node = None
 
     def get_clicked_pos(self, pos: Tuple[int, int]) -> Tuple[Optional[int], Optional[int]]:
         x, y = pos
-        max_grid_x = GRID_COLS * CELL_SIZE
-        if x >= max_grid_x or x < 0 or y < 0:
+        if not (0 <= x < GRID_PIXELS_W and 0 <= y < GRID_PIXELS_H):
             return None, None
-
-        row = y // CELL_SIZE
-        col = x // CELL_SIZE
-
-        if 0 <= row < GRID_ROWS and 0 <= col < GRID_COLS:
-            return row, col
-        return None, None
\ No newline at end of file
+        return y // CELL_SIZE, x // CELL_SIZE
@@ -1,61 +1,72 @@
 import pygame
-from typing import Tuple, Optional, Callable
+from typing import Iterator, Tuple, Optional, Callable
 from grid import Grid
+from app_state import AppState, State
 from constants import *
 
+def _line_cells(row0: int, col0: int, row1: int, col1: int) -> Iterator[Tuple[int, int]]:
+    # Bresenham walk from (row0, col0) to (row1, col1), excluding the start cell. It moves one
+    # axis per step so the painted wall has no diagonal gaps for the 4-way search to slip through.
+    d_row, d_col = abs(row1 - row0), abs(col1 - col0)
+    step_row = 1 if row1 > row0 else -1
+    step_col = 1 if col1 > col0 else -1
+    error = d_col - d_row
+    row, col = row0, col0
+    for _ in range(d_row + d_col):
+        if (2 * error > -d_row and col != col1) or row == row1:
+            error -= d_row
+            col += step_col
+        else:
+            error += d_col
+            row += step_row
+        yield row, col
+
 class InputHandler:
     def __init__(self):
         self.drawing_walls = False
         self.erasing_walls = False
+        self._last_drag_cell: Optional[Tuple[int, int]] = None
     
     def handle_grid_click(self, pos: Tuple[int, int], button: int, grid: Grid,
-                         app_state: dict, can_interact_callback: Callable[[], bool]) -> dict:
+                         app_state: AppState, can_interact_callback: Callable[[], bool]) -> None:
         if not can_interact_callback():
-            return app_state
+            return
             
         row, col = grid.get_clicked_pos(pos)
         if row is None or col is None:
-            return app_state
+            return
             
         node = grid.get_node(row, col)
         if node is None:
-            return app_state
-        
-        new_state = app_state.copy()
+            return
         
         if button == 1:  # Left click - set start/end points
-            new_state = self._handle_left_click(node, grid, new_state)
+            self._handle_left_click(node, grid, app_state)
         elif button == 3:  # Right click - toggle walls
-            new_state = self._handle_right_click(node, grid, new_state)
-            
-        return new_state
+            self._handle_right_click(node, grid)
     
-    def _handle_left_click(self, node, grid: Grid, app_state: dict) -> dict:
+    def _handle_left_click(self, node, grid: Grid, app_state: AppState) -> None:
         if node.is_wall:
-            return app_state
-            
-        new_state = app_state.copy()
+            return
         
-        if app_state['state'] == "WAITING_START":
+        if app_state.state == State.WAITING_START:
             if grid.start_node:
                 grid.start_node.reset()
             grid.start_node = node
             node.make_start()
-            new_state['state'] = "WAITING_END"
+            app_state.state = State.WAITING_END
             
-        elif app_state['state'] == "WAITING_END":
+        elif app_state.state == State.WAITING_END:
             if node != grid.start_node:
                 if grid.end_node:
                     grid.end_node.reset()
                 grid.end_node = node
                 node.make_end()
-                new_state['state'] = "READY"
-                
-        return new_state
+                app_state.state = State.READY
     
-    def _handle_right_click(self, node, grid: Grid, app_state: dict) -> dict:
+    def _handle_right_click(self, node, grid: Grid) -> None:
         if node == grid.start_node or node == grid.end_node:
-            return app_state
+            return
             
         if node.is_wall:
             node.reset()
@@ -63,47 +74,68 @@ class InputHandler:
         else:
             node.make_wall()
             self.drawing_walls = True
-            
-        return app_state
+        self._last_drag_cell = (node.row, node.col)
     
     def handle_mouse_drag(self, pos: Tuple[int, int], grid: Grid,
                          can_interact_callback: Callable[[], bool]) -> None:
 
+        # Leaving the grid, or losing interaction mid-drag, ends the stroke, so the next
+        # cell painted starts a new line instead of joining up with where this one stopped.
         if not can_interact_callback():
+            self._last_drag_cell = None
             return
             
         row, col = grid.get_clicked_pos(pos)
         if row is None or col is None:
+            self._last_drag_cell = None
             return
-            
+
+        # Motion events fire per pixel; only act once per cell entered.
+        if (row, col) == self._last_drag_cell:
+            return
+
+        # Fast drags skip cells between samples, so paint every cell on the line from the last one.
+        if self._last_drag_cell is None:
+            cells = [(row, col)]
+        else:
+            cells = _line_cells(*self._last_drag_cell, row, col)
+        self._last_drag_cell = (row, col)
+
+        for cell_row, cell_col in cells:
+            self._paint_cell(grid, cell_row, cell_col)
+
+    def _paint_cell(self, grid: Grid, row: int, col: int) -> None:
         node = grid.get_node(row, col)
         if node is None or node == grid.start_node or node == grid.end_node:
             return
         
+        # Queued rather than applied, so a whole frame of drag edits lands in one array write.
         if self.drawing_walls and not node.is_wall:
-            node.make_wall()
+            grid.queue_wall(row, col, True)
         elif self.erasing_walls and node.is_wall:
-            node.reset()
+            grid.queue_wall(row, col, False)
     
     def handle_mouse_button_up(self) -> None:
         self.drawing_walls = False
         self.erasing_walls = False
+        self._last_drag_cell = None
     
-    def handle_keyboard_input(self, event: pygame.event.Event, app_state: dict) -> Optional[str]:
+    def handle_keyboard_input(self, event: pygame.event.Event, app_state: AppState) -> Optional[str]:
+        key = event.key
 
-        if event.key == pygame.K_SPACE:
+        if key == pygame.K_SPACE:
             # Space: Find Path / Pause / Resume
-            if app_state['is_pathfinding_in_progress']:
+            if app_state.is_pathfinding_in_progress:
                 return "toggle_pause"
-            elif app_state['can_start_pathfinding']:
+            elif app_state.can_start_pathfinding:
                 return "start_pathfinding"
                 
-        elif event.key == pygame.K_c and app_state['can_interact_with_grid']:
+        elif key == pygame.K_c and app_state.can_interact_with_grid:
             # C: Clear Path
             return "clear_path"
             
-        elif event.key == pygame.K_r and app_state['can_interact_with_grid']:
+        elif key == pygame.K_r and app_state.can_interact_with_grid:
             # R: Reset All
             return "clear_all"
             
-        return None
\ No newline at end of file
+        return None
@@ -1,14 +1,19 @@
+import logging
 import pygame
 import sys
+from typing import Callable, Dict, Optional, Tuple
 from grid import Grid
 from wall_generator import WallGenerator
 from constants import *
-from typing import Dict, Any
 
+from app_state import AppState, State
 from ui_manager import UIManager
 from pathfinding_manager import PathfindingManager
+from pathfinder import PATH_STEP
 from input_handler import InputHandler
 
+log = logging.getLogger(__name__)
+
 class PathfindingVisualizer:
     def __init__(self):
         pygame.init()
@@ -23,146 +28,203 @@ class PathfindingVisualizer:
         self.input_handler = InputHandler()
 
         # Application state
-        self.app_state: Dict[str, Any] = {
-            "state": "WAITING_START", # "WAITING_START", "WAITING_END", "READY", "PATHFINDING", "PAUSED"
-            "wall_type": "maze",
-            "speed": NORMAL_SPEED,
-            "last_path_length": 0,
-            # These will be updated by pathfinding_manager's get_state()
-            'is_pathfinding_in_progress': False,
-            'pathfinding_paused': False,
-            'pathfinding_completed': False,
-            'path_found': False,
-            'can_interact_with_grid': True, # Derived state
-            'can_start_pathfinding': False # Derived state
-        }
+        self.app_state = AppState()
         
+        self.running = True
         self.quit_requested = False
+        # Set when the whole window must be pushed to the screen (first frame, re-expose)
+        self.needs_full_update = True
+        # Latest right-drag position seen this frame
+        self.drag_pos: Optional[Tuple[int, int]] = None
+
+        self.event_handlers: Dict[int, Callable[[pygame.event.Event], None]] = {
+            pygame.QUIT: self._on_quit,
+            pygame.MOUSEBUTTONDOWN: self._on_mouse_down,
+            pygame.MOUSEBUTTONUP: self._on_mouse_up,
+            pygame.MOUSEMOTION: self._on_mouse_motion,
+            pygame.VIDEOEXPOSE: self._on_expose,
+            pygame.KEYDOWN: self._on_key_down,
+        }
+        # Have SDL drop every event type nothing handles before it reaches the queue;
+        # PATH_STEP only wakes the loop, so it is let through too.
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(list(self.event_handlers) + [PATH_STEP])
 
     def _update_derived_app_state(self) -> None:
-        path_mgr_state = self.pathfinding_manager.get_state()
-        self.app_state.update(path_mgr_state)
-
-        self.app_state['can_interact_with_grid'] = not self.pathfinding_manager.is_pathfinding_in_progress()
-        self.app_state['can_start_pathfinding'] = self.pathfinding_manager.can_start_pathfinding(self.grid)
-        self.app_state['last_path_length'] = self.pathfinding_manager.last_path_length
-
-        # Update the main state string based on pathfinding manager's state
-        if self.pathfinding_manager.is_pathfinding_in_progress():
-            self.app_state['state'] = "PATHFINDING"
-        elif self.grid.start_node and self.grid.end_node:
-            self.app_state['state'] = "READY"
+        app_state = self.app_state
+        manager = self.pathfinding_manager
+        # Read the manager's progress once so every derived field agrees with it,
+        # even if the pathfinding thread finishes partway through this update.
+        in_progress = manager.is_pathfinding_in_progress()
+        has_endpoints = self.grid.start_node is not None and self.grid.end_node is not None
+        app_state.is_pathfinding_in_progress = in_progress
+        app_state.pathfinding_paused = manager.pathfinding_paused
+        app_state.pathfinding_completed = manager.pathfinding_completed
+        app_state.path_found = manager.path_found
+
+        app_state.can_interact_with_grid = not in_progress
+        app_state.can_start_pathfinding = has_endpoints and not in_progress
+        app_state.last_path_length = manager.last_path_length
+
+        # Update the main state based on pathfinding manager's state
+        if in_progress:
+            app_state.state = State.PATHFINDING
+        elif has_endpoints:
+            app_state.state = State.READY
         elif self.grid.start_node:
-            self.app_state['state'] = "WAITING_END"
+            app_state.state = State.WAITING_END
         else:
-            self.app_state['state'] = "WAITING_START"
+            app_state.state = State.WAITING_START
 
     def generate_walls(self) -> None:
-        if not self.app_state['can_interact_with_grid']:
+        if not self.app_state.can_interact_with_grid:
             return
 
-        WallGenerator.generate_wall(self.grid, self.app_state['wall_type'])
+        WallGenerator.generate_wall(self.grid, self.app_state.wall_type)
         self.grid.start_node = None
         self.grid.end_node = None
-        self.app_state['state'] = "WAITING_START"
+        self.app_state.state = State.WAITING_START
         self.pathfinding_manager.last_path_length = 0
 
     def clear_path(self) -> None:
-        if not self.app_state['can_interact_with_grid']:
+        if not self.app_state.can_interact_with_grid:
             return
 
         self.grid.clear_path()
         self.pathfinding_manager.last_path_length = 0
 
     def clear_all(self) -> None:
-        if not self.app_state['can_interact_with_grid']:
+        if not self.app_state.can_interact_with_grid:
             return
 
         self.grid.clear_all()
         self.grid.start_node = None
         self.grid.end_node = None
-        self.app_state['state'] = "WAITING_START"
+        self.app_state.state = State.WAITING_START
         self.pathfinding_manager.last_path_length = 0
         self.pathfinding_manager.stop_pathfinding()
 
+    def handle_drag(self, pos: Tuple[int, int]) -> None:
+        self.input_handler.handle_mouse_drag(
+            pos, self.grid, lambda: self.app_state.can_interact_with_grid
+        )
+
     def handle_quit(self) -> None:
         self.quit_requested = True
         self.pathfinding_manager.request_quit()
         pygame.quit()
         sys.exit()
 
+    def _on_quit(self, event: pygame.event.Event) -> None:
+        self.running = False
+
+    def _on_mouse_down(self, event: pygame.event.Event) -> None:
+        # Check for UI clicks first
+        action_type, action_data = self.ui_manager.handle_ui_click(event.pos)
+        if action_type:
+            if action_type == "generate_walls":
+                self.generate_walls()
+            elif action_type == "set_wall_type":
+                self.app_state.wall_type = action_data
+            elif action_type == "toggle_pathfinding":
+                if self.pathfinding_manager.is_pathfinding_in_progress():
+                    self.pathfinding_manager.toggle_pause()
+                elif self.app_state.can_start_pathfinding:
+                    self.pathfinding_manager.start_pathfinding(
+                        self.grid, self.app_state.speed, self.clear_path
+                    )
+            elif action_type == "set_speed":
+                self.app_state.speed = action_data
+            elif action_type == "clear_path":
+                self.clear_path()
+            elif action_type == "clear_all":
+                self.clear_all()
+        else:
+            # If not a UI click, handle as a grid click
+            self.input_handler.handle_grid_click(
+                event.pos, event.button, self.grid,
+                self.app_state, lambda: self.app_state.can_interact_with_grid
+            )
+
+    def _on_mouse_up(self, event: pygame.event.Event) -> None:
+        if self.drag_pos:
+            self.handle_drag(self.drag_pos)
+            self.drag_pos = None
+        self.input_handler.handle_mouse_button_up()
+
+    def _on_mouse_motion(self, event: pygame.event.Event) -> None:
+        if event.buttons[2]: # Right click held for dragging
+            self.drag_pos = event.pos
+
+    def _on_expose(self, event: pygame.event.Event) -> None:
+        self.needs_full_update = True
+
+    def _on_key_down(self, event: pygame.event.Event) -> None:
+        action = self.input_handler.handle_keyboard_input(event, self.app_state)
+        if action == "toggle_pause":
+            self.pathfinding_manager.toggle_pause()
+        elif action == "start_pathfinding":
+            self.pathfinding_manager.start_pathfinding(
+                self.grid, self.app_state.speed, self.clear_path
+            )
+        elif action == "clear_path":
+            self.clear_path()
+        elif action == "clear_all":
+            self.clear_all()
+
     def run(self) -> None:
-        running = True
+        # Whether the last frame drew anything
+        animating = True
         try:
-            while running and not self.quit_requested:
-                # Always update derived states at the beginning of each loop iteration
+            while self.running and not self.quit_requested:
+                # Motion events can arrive by the dozen per frame during a drag; only the
+                # latest position is handled, since the drag walks the line between samples.
+                self.drag_pos = None
+                events = pygame.event.get()
+                if not events and not animating:
+                    # Nothing changed last frame, so sleep until input arrives or the search
+                    # thread posts PATH_STEP, instead of spinning at 60 Hz.
+                    events = [pygame.event.wait(IDLE_EVENT_TIMEOUT)] + pygame.event.get()
+
+                # Derived state is refreshed after waiting, so it is current for this frame
                 self._update_derived_app_state()
 
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        running = False
-                        break
-
-                    elif event.type == pygame.MOUSEBUTTONDOWN:
-                        # Check for UI clicks first
-                        action_type, action_data = self.ui_manager.handle_ui_click(pygame.mouse.get_pos())
-                        if action_type:
-                            if action_type == "generate_walls":
-                                self.generate_walls()
-                            elif action_type == "set_wall_type":
-                                self.app_state['wall_type'] = action_data
-                            elif action_type == "toggle_pathfinding":
-                                if self.pathfinding_manager.is_pathfinding_in_progress():
-                                    self.pathfinding_manager.toggle_pause()
-                                elif self.app_state['can_start_pathfinding']:
-                                    self.pathfinding_manager.start_pathfinding(
-                                        self.grid, self.app_state['speed'], self.clear_path
-                                    )
-                            elif action_type == "set_speed":
-                                self.app_state['speed'] = action_data
-                            elif action_type == "clear_path":
-                                self.clear_path()
-                            elif action_type == "clear_all":
-                                self.clear_all()
-                        else:
-                            # If not a UI click, handle as a grid click
-                            self.app_state = self.input_handler.handle_grid_click(
-                                pygame.mouse.get_pos(), event.button, self.grid,
-                                self.app_state, lambda: self.app_state['can_interact_with_grid']
-                            )
-
-                    elif event.type == pygame.MOUSEBUTTONUP:
-                        self.input_handler.handle_mouse_button_up()
-
-                    elif event.type == pygame.MOUSEMOTION:
-                        if pygame.mouse.get_pressed()[2]: # Right click held for dragging
-                            self.input_handler.handle_mouse_drag(
-                                pygame.mouse.get_pos(), self.grid,
-                                lambda: self.app_state['can_interact_with_grid']
-                            )
-
-                    elif event.type == pygame.KEYDOWN:
-                        action = self.input_handler.handle_keyboard_input(event, self.app_state)
-                        if action == "toggle_pause":
-                            self.pathfinding_manager.toggle_pause()
-                        elif action == "start_pathfinding":
-                            self.pathfinding_manager.start_pathfinding(
-                                self.grid, self.app_state['speed'], self.clear_path
-                            )
-                        elif action == "clear_path":
-                            self.clear_path()
-                        elif action == "clear_all":
-                            self.clear_all()
-
-                # Drawing Phase
-                self.window.fill(BG_DARK)
-                self.grid.draw(self.window)
-                self.ui_manager.draw_ui(self.window, self.app_state) # Pass the consolidated app_state
-                pygame.display.flip()
+                # Event types without a handler (PATH_STEP, window events, ...) are skipped
+                for event in events:
+                    handler = self.event_handlers.get(event.type)
+                    if handler:
+                        handler(event)
+                        if not self.running:
+                            break
+
+                # Closing the window ends the loop here, without drawing a frame nobody will see
+                if not self.running or self.quit_requested:
+                    break
+
+                if self.drag_pos:
+                    self.handle_drag(self.drag_pos)
+
+                # Apply this frame's queued drag edits in one batch before drawing
+                self.grid.apply_pending_walls()
+
+                # Drawing Phase: grid and panel cover the whole window, so only
+                # the cells and panel that changed are pushed to the screen.
+                dirty_rects = self.grid.draw(self.window)
+                ui_rect = self.ui_manager.draw_ui(self.window, self.app_state)
+                if ui_rect:
+                    dirty_rects.append(ui_rect)
+                # Past most of the window, one full flip is cheaper than many rects.
+                dirty_area = sum(rect.w * rect.h for rect in dirty_rects)
+                if self.needs_full_update or dirty_area > FULL_FLIP_AREA:
+                    pygame.display.flip()
+                    self.needs_full_update = False
+                elif dirty_rects:
+                    pygame.display.update(dirty_rects)
+                animating = bool(dirty_rects)
                 self.clock.tick(60)
 
-        except Exception as e:
-            print(f"Error in main loop: {e}")
+        except Exception:
+            log.exception("Error in main loop")
         finally:
             self.handle_quit()
 
@@ -170,7 +232,7 @@ if __name__ == "__main__":
     try:
         app = PathfindingVisualizer()
         app.run()
-    except Exception as e:
-        print(f"Error starting application: {e}")
+    except Exception:
+        log.exception("Error starting application")
         pygame.quit()
         sys.exit()
\ No newline at end of file
@@ -1,45 +1,42 @@
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING
 from constants import *
 
+if TYPE_CHECKING:
+    from grid import Grid
+
 class Node:
-    def __init__(self, row: int, col: int):
+    # Lightweight view onto a single cell of the Grid's arrays; all state lives in the Grid.
+    __slots__ = ('grid', 'row', 'col')
+
+    def __init__(self, grid: 'Grid', row: int, col: int):
+        self.grid = grid
         self.row: int = row
         self.col: int = col
-        self.x: int = col * CELL_SIZE
-        self.y: int = row * CELL_SIZE
-        self.color: Tuple[int, int, int] = NODE_DEFAULT
-        self.neighbors: List['Node'] = []
-        self.is_wall: bool = False
 
-        self.distance: float = float('inf')
-        self.previous: Optional['Node'] = None
-        self.visited: bool = False
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Node):
+            return NotImplemented
+        return self.grid is other.grid and self.row == other.row and self.col == other.col
 
-    def __lt__(self, other: 'Node') -> bool:
-        return self.distance < other.distance
+    def __hash__(self) -> int:
+        return hash((self.row, self.col))
 
-    def make_wall(self) -> None:
-        self.is_wall = True
-        self.color = WALL
+    @property
+    def is_wall(self) -> bool:
+        return bool(self.grid.is_wall[self.row, self.col])
 
-    def make_path(self) -> None:
-        self.color = NODE_PATH
+    def _set_state(self, state: int) -> None:
+        self.grid.state[self.row, self.col] = state
+
+    def make_wall(self) -> None:
+        self.grid.is_wall[self.row, self.col] = True
+        self._set_state(STATE_WALL)
 
     def make_start(self) -> None:
-        self.color = NODE_START
+        self._set_state(STATE_START)
 
     def make_end(self) -> None:
-        self.color = NODE_END
-
-    def make_visited(self) -> None:
-        self.color = NODE_VISITED
-
-    def make_unvisited_neighbor(self) -> None:
-        self.color = NODE_NEIGHBOR
+        self._set_state(STATE_END)
 
     def reset(self) -> None:
-        self.color = NODE_DEFAULT
-        self.is_wall = False
-        self.distance = float('inf')
-        self.previous = None
-        self.visited = False
\ No newline at end of file
+        self.grid.reset_cell(self.row, self.col)
@@ -1,125 +1,193 @@
-from typing import Optional, Callable, List
-import heapq
+from typing import Optional, List, Tuple
+from collections import deque
+from itertools import chain
+import threading
 import time
+import numpy as np
+import pygame
 from grid import Grid
 from node import Node
 from constants import *
 
+# Posted by the search thread after drawing new cells, just before it sleeps, so the
+# main loop can block on the event queue instead of polling between steps.
+PATH_STEP = pygame.event.custom_type()
+
+# Shortest delay worth sleeping for; below this the scheduler's wake-up jitter dominates.
+MIN_SLEEP = 0.001
+
+def bfs_search(offsets: List[int], indices: List[int], start: int,
+               end: int) -> Tuple[List[Tuple[int, List[int]]], List[int]]:
+    # Unit-cost breadth-first search over flat cell indices and the grid's CSR adjacency,
+    # with no drawing. Every edge costs 1, so the FIFO queue yields cells in nondecreasing
+    # distance and settles them in the same order Dijkstra would: each cell is queued once,
+    # with its final distance.
+    # Returns one (settled cell, newly discovered cells) step per settled cell in order,
+    # plus the final previous array.
+    inf = float('inf')
+    distance = [inf] * (len(offsets) - 1)
+    previous = [-1] * (len(offsets) - 1)
+    steps: List[Tuple[int, List[int]]] = []
+
+    distance[start] = 0
+    queue = deque([start])
+    while queue:
+        current = queue.popleft()
+
+        discovered = []
+        steps.append((current, discovered))
+        if current == end:
+            break
+
+        new_distance = distance[current] + 1
+        for neighbor in indices[offsets[current]:offsets[current + 1]]:
+            if distance[neighbor] == inf:
+                discovered.append(neighbor)
+                distance[neighbor] = new_distance
+                previous[neighbor] = current
+                if neighbor == end:
+                    # With unit costs the end's first distance is final, so settle it now
+                    # rather than draining the rest of its distance layer first.
+                    steps.append((end, []))
+                    return steps, previous
+                queue.append(neighbor)
+
+    return steps, previous
+
+def _wait_until(deadline: float, stop_event: threading.Event) -> bool:
+    # Sleeps until an absolute perf_counter() deadline, so an oversleep on one step is
+    # made up on the next ones instead of accumulating. True if stopped meanwhile.
+    remaining = deadline - time.perf_counter()
+    if remaining > 0:
+        return stop_event.wait(remaining)
+    return stop_event.is_set()
+
 class Pathfinder:
 
+    @staticmethod
+    def _control_events(resume_event: Optional[threading.Event],
+                        stop_event: Optional[threading.Event]) -> Tuple[threading.Event, threading.Event]:
+        # Without a controlling manager, run straight through: never paused, never stopped.
+        if resume_event is None:
+            resume_event = threading.Event()
+            resume_event.set()
+        if stop_event is None:
+            stop_event = threading.Event()
+        return resume_event, stop_event
+
     @staticmethod
     def dijkstra(grid: Grid, start: Optional[Node], end: Optional[Node],
                            speed: float = NORMAL_SPEED,
-                           should_pause: Optional[Callable[[], bool]] = None,
-                           should_stop: Optional[Callable[[], bool]] = None) -> bool:
+                           resume_event: Optional[threading.Event] = None,
+                           stop_event: Optional[threading.Event] = None) -> bool:
 
         if not start or not end:
             return False
 
-        if should_pause is None:
-            should_pause = lambda: False
-        if should_stop is None:
-            should_stop = lambda: False
-
-        for row_list in grid.grid:
-            for node in row_list:
-                node.distance = float('inf')
-                node.previous = None
-                node.visited = False
-                if not node.is_wall and node != start and node != end:
-                    node.reset()
+        resume_event, stop_event = Pathfinder._control_events(resume_event, stop_event)
 
+        grid.clear_path()
         grid.set_neighbors()
-        start.distance = 0
-
-        pq = [(0, id(start), start)]
-        unvisited_set = {start}
-
-        nodes_processed = 0 
-        sleep_frequency = max(1, int(50 / (speed * 1000))) if speed > 0 else 50
 
-        while pq:
-            if should_stop():
+        # Run the whole search up front, then animate the recorded steps.
+        start_index = start.row * grid.cols + start.col
+        end_index = end.row * grid.cols + end.col
+        # All grid edges cost 1, so Dijkstra reduces to a breadth-first search.
+        steps, previous = bfs_search(grid.neighbor_offsets.tolist(),
+                                     grid.neighbor_indices.tolist(),
+                                     start_index, end_index)
+        grid.previous[:] = np.reshape(previous, grid.previous.shape)
+        state = grid.state.reshape(-1)
+        visited = grid.visited.reshape(-1)
+
+        if speed <= 0:
+            # Nothing to animate, so skip the per-step replay and paint every step at once.
+            return Pathfinder._apply_steps(state, visited, steps, start_index, end_index)
+
+        # Animation time per settled cell: one interval of speed per batch of
+        # 50 / (speed * 1000) cells, the pace the search has always run at.
+        step_time = speed / max(1, int(50 / (speed * 1000)))
+        # The events are checked on every step, so bind their methods once.
+        is_running, is_stopped = resume_event.is_set, stop_event.is_set
+        deadline = time.perf_counter()
+
+        for current, discovered in steps:
+            if not is_running():
+                # Blocks while paused; stopping sets the resume event too, so this always wakes.
+                resume_event.wait()
+                deadline = time.perf_counter()
+            if is_stopped():
                 return False
 
-            # Handle pause state: The algorithm enters a busy-wait loop until unpaused or stopped.
-            while should_pause() and not should_stop():
-                time.sleep(0.1) # Small delay to prevent high CPU usage during pause.
+            visited[current] = True
 
-            if should_stop():
-                return False
-
-            _, _, current_node = heapq.heappop(pq)
-
-            if current_node not in unvisited_set:
-                continue
-
-            unvisited_set.remove(current_node)
-            current_node.visited = True
-
-            if current_node == end:
+            if current == end_index:
                 return True
 
-            if current_node != start:
-                current_node.make_visited()
-
-            for neighbor in current_node.neighbors:
-                if neighbor.visited:
-                    continue # Skip if neighbor has already been fully processed.
+            if current != start_index:
+                state[current] = STATE_VISITED
 
-                new_distance = current_node.distance + 1
+            for neighbor in discovered:
+                if neighbor != end_index:
+                    state[neighbor] = STATE_NEIGHBOR
 
-                if new_distance < neighbor.distance:
-                    neighbor.distance = new_distance
-                    neighbor.previous = current_node
-
-                    if neighbor not in unvisited_set:
-                        unvisited_set.add(neighbor) 
-                        heapq.heappush(pq, (new_distance, id(neighbor), neighbor))
-                        if neighbor != end:
-                            neighbor.make_unvisited_neighbor()
-
-            nodes_processed += 1
-            if nodes_processed % sleep_frequency == 0 and speed > 0:
-                time.sleep(speed)
+            # Let the delay build up and sleep only once it is long enough to be worth it.
+            deadline += step_time
+            if deadline - time.perf_counter() >= MIN_SLEEP:
+                pygame.event.post(pygame.event.Event(PATH_STEP))
+                if _wait_until(deadline, stop_event):
+                    return False
 
         return False
 
     @staticmethod
-    def reconstruct_path(end: Node, speed: float = NORMAL_SPEED,
-                                   should_pause: Optional[Callable[[], bool]] = None,
-                                   should_stop: Optional[Callable[[], bool]] = None) -> int:
-
-        if should_pause is None:
-            should_pause = lambda: False
-        if should_stop is None:
-            should_stop = lambda: False
-
-        path_length = 0
-        current = end
-        path_nodes: List[Node] = [] 
-
-        while current.previous:
-            current = current.previous
+    def _apply_steps(state: np.ndarray, visited: np.ndarray, steps: List[Tuple[int, List[int]]],
+                     start_index: int, end_index: int) -> bool:
+        settled = np.fromiter((cell for cell, _ in steps), dtype=np.intp, count=len(steps))
+        discovered = np.fromiter(chain.from_iterable(found for _, found in steps), dtype=np.intp)
+        visited[settled] = True
+        # Settled cells were all discovered first, so painting them second leaves the same
+        # final colors as the step-by-step replay.
+        state[discovered[discovered != end_index]] = STATE_NEIGHBOR
+        state[settled[(settled != start_index) & (settled != end_index)]] = STATE_VISITED
+        return steps[-1][0] == end_index
 
-            # Ensure the start node itself is not marked as part of the 'path' path.
-            if current.color != NODE_START:
-                path_nodes.append(current)
-                path_length += 1
-
-        for node in reversed(path_nodes):
-            if should_stop():
-                return path_length
-
-            while should_pause() and not should_stop():
-                time.sleep(0.1)
-
-            if should_stop():
+    @staticmethod
+    def reconstruct_path(end: Node, speed: float = NORMAL_SPEED,
+                                   resume_event: Optional[threading.Event] = None,
+                                   stop_event: Optional[threading.Event] = None) -> int:
+
+        resume_event, stop_event = Pathfinder._control_events(resume_event, stop_event)
+
+        grid = end.grid
+        previous = grid.previous.reshape(-1).tolist()
+        state = grid.state.reshape(-1)
+
+        # Walk the flat previous chain back from the end. The chain ends at the start cell,
+        # the only one without a previous, and it is not part of the path.
+        path_cells: List[int] = []
+        current = previous[end.row * grid.cols + end.col]
+        while current >= 0 and previous[current] >= 0:
+            path_cells.append(current)
+            current = previous[current]
+        path_cells.reverse()
+        path_length = len(path_cells)
+
+        is_running, is_stopped = resume_event.is_set, stop_event.is_set
+        deadline = time.perf_counter()
+        for cell in path_cells:
+            if not is_running():
+                resume_event.wait()
+                deadline = time.perf_counter()
+            if is_stopped():
                 return path_length
 
-            node.make_path()
+            state[cell] = STATE_PATH
 
             if speed > 0:
-                time.sleep(speed * 2)
+                pygame.event.post(pygame.event.Event(PATH_STEP))
+                deadline += speed * 2
+                if _wait_until(deadline, stop_event):
+                    return path_length
 
         return path_length
\ No newline at end of file
@@ -1,21 +1,33 @@
+import logging
 import threading
+import pygame
 from typing import Callable, Optional
 from grid import Grid
-from pathfinder import Pathfinder
+from pathfinder import Pathfinder, PATH_STEP
+
+log = logging.getLogger(__name__)
 
 class PathfindingManager:
     
     def __init__(self):
         self.pathfinding_thread: Optional[threading.Thread] = None
         self.pathfinding_active = False
-        self.pathfinding_paused = False
         self.pathfinding_completed = False
         self.path_found = False
-        self.quit_requested = False
         self.last_path_length = 0
         
         # Thread safety lock
         self.pathfinding_lock = threading.Lock()
+
+        # The pathfinding thread blocks on these instead of polling flags: it waits on
+        # _resume_event while paused and sleeps between steps with _stop_event.wait().
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+        self._stop_event = threading.Event()
+
+    @property
+    def pathfinding_paused(self) -> bool:
+        return not self._resume_event.is_set()
     
     def is_pathfinding_in_progress(self) -> bool:
         return self.pathfinding_active and not self.pathfinding_completed
@@ -30,11 +42,14 @@ class PathfindingManager:
 
         if not self.can_start_pathfinding(grid):
             return
+
+        grid.apply_pending_walls()
         
         with self.pathfinding_lock:
             self.pathfinding_active = True
-            self.pathfinding_paused = False
             self.pathfinding_completed = False
+        self._stop_event.clear()
+        self._resume_event.set()
         
         # Clear any previous path
         clear_path_callback()
@@ -51,26 +66,32 @@ class PathfindingManager:
         if not self.is_pathfinding_in_progress():
             return
         
-        with self.pathfinding_lock:
-            self.pathfinding_paused = not self.pathfinding_paused
+        if self._resume_event.is_set():
+            self._resume_event.clear()
+        else:
+            self._resume_event.set()
     
     def stop_pathfinding(self) -> None:
         with self.pathfinding_lock:
             self.pathfinding_active = False
             self.pathfinding_completed = True
+        # Setting resume as well wakes a thread that is waiting out a pause.
+        self._stop_event.set()
+        self._resume_event.set()
         
         if self.pathfinding_thread and self.pathfinding_thread.is_alive():
             self.pathfinding_thread.join(timeout=1.0)
     
     def request_quit(self) -> None:
-        self.quit_requested = True
+        self._stop_event.set()
+        self._resume_event.set()
         if self.is_pathfinding_in_progress():
             self.stop_pathfinding()
     
     def _run_pathfinding_thread(self, grid: Grid, speed: float) -> None:
         try:
             if not grid.start_node or not grid.end_node:
-                print("Error: Start or end node not set for pathfinding.")
+                log.error("Start or end node not set for pathfinding.")
                 return
             
             # Run Dijkstra's algorithm
@@ -79,8 +100,8 @@ class PathfindingManager:
                 grid.start_node,
                 grid.end_node,
                 speed,
-                self._should_pause,
-                self._should_stop
+                self._resume_event,
+                self._stop_event
             )
             
             if self._should_stop():
@@ -91,32 +112,24 @@ class PathfindingManager:
                 self.last_path_length = Pathfinder.reconstruct_path(
                     grid.end_node,
                     speed,
-                    self._should_pause,
-                    self._should_stop
+                    self._resume_event,
+                    self._stop_event
                 )
                 self.path_found = True
             else:
                 self.last_path_length = 0
                 self.path_found = False
                 
-        except Exception as e:
-            print(f"Error in pathfinding thread: {e}")
+        except Exception:
+            log.exception("Error in pathfinding thread")
         finally:
             with self.pathfinding_lock:
                 self.pathfinding_completed = True
                 self.pathfinding_active = False
-    
-    def _should_pause(self) -> bool:
-        return self.pathfinding_paused
+            # Wake the main loop so the final state is drawn straight away; on exit the
+            # main thread may already have shut pygame down after a timed-out join.
+            if pygame.get_init():
+                pygame.event.post(pygame.event.Event(PATH_STEP))
     
     def _should_stop(self) -> bool:
-        return self.quit_requested or not self.pathfinding_active
-    
-    def get_state(self) -> dict:
-        return {
-            'is_pathfinding_in_progress': self.is_pathfinding_in_progress(),
-            'pathfinding_paused': self.pathfinding_paused,
-            'pathfinding_completed': self.pathfinding_completed,
-            'path_found': self.path_found,
-            'last_path_length': self.last_path_length
-        }
\ No newline at end of file
+        return self._stop_event.is_set()
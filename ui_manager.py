@@ -1,94 +1,161 @@
 import pygame
-from typing import Dict, Tuple, Any
+from dataclasses import replace
+from typing import Dict, List, Optional, Tuple, Any
 from constants import *
+from app_state import AppState, State
+
+INSTRUCTIONS = [
+    "1. Click to set START point",
+    "2. Click to set END point",
+    "3. Click 'Find Path' to run",
+    "",
+    "Controls:",
+    "• Left click: Set points",
+    "• Right click: Toggle walls",
+    "• Hold and drag: Draw walls",
+    "• Space: Find/Pause path",
+    "• C: Clear path",
+    "• R: Reset all"
+]
+
+# Status line for each State, indexed by its value
+STATE_MESSAGES = (
+    "Click to set START point",
+    "Click to set END point",
+    "Ready to find path!",
+    "Finding path..."
+)
 
 class UIManager:
     
     def __init__(self):
         self.font = pygame.font.SysFont('arial', 16)
         self.title_font = pygame.font.SysFont('arial', 20, bold=True)
-        self.button_positions: Dict[str, Any] = {}
-        
-    def draw_ui(self, window: pygame.Surface, app_state: Dict[str, Any]) -> None:
-        # Define UI panel area
-        ui_panel = pygame.Rect(GRID_COLS * CELL_SIZE, 0,
-                              WINDOW_WIDTH - GRID_COLS * CELL_SIZE, WINDOW_HEIGHT)
-        pygame.draw.rect(window, BG_LIGHT, ui_panel)
-        
+        self._small_font = pygame.font.SysFont('arial', 12)
+        # (rect, enabled, (action_type, action_data)) for every button, in panel-local coordinates
+        self._buttons: List[Tuple[pygame.Rect, bool, Tuple[str, Any]]] = []
+        # Rects of self._buttons in the same order, for a single collidelist() hit test
+        self._button_rects: List[pygame.Rect] = []
+
+        # Every constant string is rasterized once here, already converted to the display
+        # format; only the path length and status message are rendered per redraw.
+        self._title_surface = self.title_font.render("Dijkstra's Algorithm", True, TEXT_PRIMARY).convert_alpha()
+        self._instruction_surfaces = [self.font.render(text, True, TEXT_SECONDARY).convert_alpha()
+                                      for text in INSTRUCTIONS]
+        self._speed_heading_surface = self.font.render("Pathfinding Speed:", True, TEXT_PRIMARY).convert_alpha()
+        self._labels: Dict[Tuple[str, Tuple[int, int, int]], pygame.Surface] = {}
+        for text in ("Generate Walls", "Find Shortest Path", "Pause Path Finding",
+                     "Resume Path Finding", "Clear All"):
+            for color in (TEXT_PRIMARY, TEXT_SECONDARY):
+                self._labels[text, color] = self.font.render(text, True, color).convert_alpha()
+        for color in (BG_LIGHT, TEXT_SECONDARY):
+            self._labels["Clear Path", color] = self.font.render("Clear Path", True, color).convert_alpha()
+        for text in ("Maze", "Random", "Normal", "Fast", "Instant"):
+            for color in (TEXT_PRIMARY, TEXT_SECONDARY):
+                self._labels[text, color] = self._small_font.render(text, True, color).convert_alpha()
+        # Status line and path length text, rendered on first use and reused afterwards
+        self._text_cache: Dict[Tuple[str, Tuple[int, int, int]], pygame.Surface] = {}
+
+        # The panel is rendered straight into a subsurface of the window (in panel-local
+        # coordinates) and only re-rendered when the app state it was drawn from changes;
+        # the window keeps those pixels between frames.
+        self.panel_rect = pygame.Rect(UI_PANEL_X, 0, UI_PANEL_WIDTH, WINDOW_HEIGHT)
+        self._panel_surface: Optional[pygame.Surface] = None
+        self._rendered_state: Optional[AppState] = None
+        self._build_layout()
+        
+    def draw_ui(self, window: pygame.Surface, app_state: AppState) -> Optional[pygame.Rect]:
+        # Returns the panel rect when it was re-rendered, otherwise None.
+        if self._panel_surface is None:
+            self._panel_surface = window.subsurface(self.panel_rect)
+        if app_state == self._rendered_state:
+            return None
+        self._render_ui(self._panel_surface, app_state)
+        self._rendered_state = replace(app_state)
+        return self.panel_rect
+
+    def _build_layout(self) -> None:
+        # Every element sits at a fixed spot in the panel, so positions and button rects
+        # are worked out once here instead of on every render.
+        x = BUTTON_MARGIN
         y_offset = 20
-        button_x = GRID_COLS * CELL_SIZE + BUTTON_MARGIN
-        
-        # Draw title
-        y_offset = self._draw_title(window, y_offset)
+        self._title_pos = (20, y_offset)
+        y_offset += 40
+
+        self._instructions_y = y_offset
+        y_offset += 20 * len(INSTRUCTIONS) + 20
+
+        self._generate_rect = pygame.Rect(x, y_offset, BUTTON_WIDTH, BUTTON_HEIGHT)
+        y_offset += BUTTON_HEIGHT + BUTTON_MARGIN
+        self._wall_type_rects = [pygame.Rect(x + i * 55, y_offset, 50, 30) for i in range(2)]
+        y_offset += 40
+
+        self._find_path_rect = pygame.Rect(x, y_offset, BUTTON_WIDTH, BUTTON_HEIGHT)
+        y_offset += BUTTON_HEIGHT + BUTTON_MARGIN
+
+        self._speed_heading_pos = (x, y_offset)
+        y_offset += 25
+        self._speed_rects = [pygame.Rect(x + i * 55, y_offset, 50, 30) for i in range(3)]
+        y_offset += 40
+
+        self._clear_path_rect = pygame.Rect(x, y_offset, BUTTON_WIDTH, BUTTON_HEIGHT)
+        y_offset += BUTTON_HEIGHT + BUTTON_MARGIN
+        self._clear_all_rect = pygame.Rect(x, y_offset, BUTTON_WIDTH, BUTTON_HEIGHT)
+        y_offset += BUTTON_HEIGHT + BUTTON_MARGIN * 2
+
+        self._status_pos = (x, y_offset)
+
+    def _render_ui(self, surface: pygame.Surface, app_state: AppState) -> None:
+        surface.fill(BG_LIGHT)
+        self._buttons = []
         
-        # Draw instructions
-        y_offset = self._draw_instructions(window, y_offset)
+        # Draw title and instructions
+        self._draw_title(surface)
+        self._draw_instructions(surface)
         
         # Draw control buttons
-        y_offset = self._draw_wall_generation_controls(window, button_x, y_offset, app_state)
-        y_offset = self._draw_pathfinding_controls(window, button_x, y_offset, app_state)
-        y_offset = self._draw_speed_controls(window, button_x, y_offset, app_state)
-        y_offset = self._draw_clear_controls(window, button_x, y_offset, app_state)
+        self._draw_wall_generation_controls(surface, app_state)
+        self._draw_pathfinding_controls(surface, app_state)
+        self._draw_speed_controls(surface, app_state)
+        self._draw_clear_controls(surface, app_state)
         
         # Draw status and path info
-        self._draw_status_info(window, button_x, y_offset, app_state)
+        self._draw_status_info(surface, app_state)
+        self._button_rects = [rect for rect, _, _ in self._buttons]
     
-    def _draw_title(self, window: pygame.Surface, y_offset: int) -> int:
-        title = self.title_font.render("Dijkstra's Algorithm", True, TEXT_PRIMARY)
-        window.blit(title, (GRID_COLS * CELL_SIZE + 20, y_offset))
-        return y_offset + 40
+    def _draw_title(self, surface: pygame.Surface) -> None:
+        surface.blit(self._title_surface, self._title_pos)
     
-    def _draw_instructions(self, window: pygame.Surface, y_offset: int) -> int:
-        instructions = [
-            "1. Click to set START point",
-            "2. Click to set END point", 
-            "3. Click 'Find Path' to run",
-            "",
-            "Controls:",
-            "• Left click: Set points",
-            "• Right click: Toggle walls",
-            "• Hold and drag: Draw walls",
-            "• Space: Find/Pause path",
-            "• C: Clear path",
-            "• R: Reset all"
-        ]
-        
-        for instruction in instructions:
-            text_surface = self.font.render(instruction, True, TEXT_SECONDARY)
-            window.blit(text_surface, (GRID_COLS * CELL_SIZE + 20, y_offset))
+    def _draw_instructions(self, surface: pygame.Surface) -> None:
+        y_offset = self._instructions_y
+        for text_surface in self._instruction_surfaces:
+            surface.blit(text_surface, (20, y_offset))
             y_offset += 20
-            
-        return y_offset + 20
     
-    def _draw_wall_generation_controls(self, window: pygame.Surface, button_x: int, 
-                                     y_offset: int, app_state: Dict[str, Any]) -> int:
+    def _draw_wall_generation_controls(self, surface: pygame.Surface, app_state: AppState) -> None:
 
-        can_interact = app_state['can_interact_with_grid']
-        wall_type = app_state['wall_type']
+        can_interact = app_state.can_interact_with_grid
+        wall_type = app_state.wall_type
         
         # Generate Walls button
         generate_enabled = can_interact
         generate_color = BUTTON_NORMAL if generate_enabled else BUTTON_DISABLED
-        generate_rect = pygame.Rect(button_x, y_offset, BUTTON_WIDTH, BUTTON_HEIGHT)
+        generate_rect = self._generate_rect
         
-        self.button_positions['generate_wall'] = (generate_rect, generate_enabled)
+        self._buttons.append((generate_rect, generate_enabled, ("generate_walls", None)))
         
-        pygame.draw.rect(window, generate_color, generate_rect)
-        pygame.draw.rect(window, ACCENT if generate_enabled else BG_DARK, generate_rect, 2)
+        pygame.draw.rect(surface, generate_color, generate_rect)
+        pygame.draw.rect(surface, ACCENT if generate_enabled else BG_DARK, generate_rect, 2)
         
         text_color = TEXT_PRIMARY if generate_enabled else TEXT_SECONDARY
-        generate_text = self.font.render("Generate Walls", True, text_color)
+        generate_text = self._labels["Generate Walls", text_color]
         text_rect = generate_text.get_rect(center=generate_rect.center)
-        window.blit(generate_text, text_rect)
-        
-        y_offset += BUTTON_HEIGHT + BUTTON_MARGIN
+        surface.blit(generate_text, text_rect)
         
         # Wall type buttons
         wall_types = ["Maze", "Random"]
         wall_type_keys = ['maze', 'random']
-        self.button_positions['wall_types'] = []
-        
-        for i, (wtype_name, wtype_key) in enumerate(zip(wall_types, wall_type_keys)):
+        for wtype_name, wtype_key, type_rect in zip(wall_types, wall_type_keys, self._wall_type_rects):
             if generate_enabled and wall_type == wtype_key:
                 color = BUTTON_ACTIVE
             elif generate_enabled:
@@ -96,25 +163,21 @@ class UIManager:
             else:
                 color = BUTTON_DISABLED
                 
-            type_rect = pygame.Rect(button_x + i * 55, y_offset, 50, 30)
-            self.button_positions['wall_types'].append((type_rect, wtype_key, generate_enabled))
+            self._buttons.append((type_rect, generate_enabled, ("set_wall_type", wtype_key)))
             
-            pygame.draw.rect(window, color, type_rect)
-            pygame.draw.rect(window, BG_DARK, type_rect, 1)
+            pygame.draw.rect(surface, color, type_rect)
+            pygame.draw.rect(surface, BG_DARK, type_rect, 1)
             
             text_color = TEXT_PRIMARY if generate_enabled else TEXT_SECONDARY
-            type_text = pygame.font.SysFont('arial', 12).render(wtype_name, True, text_color)
+            type_text = self._labels[wtype_name, text_color]
             text_rect = type_text.get_rect(center=type_rect.center)
-            window.blit(type_text, text_rect)
-            
-        return y_offset + 40
+            surface.blit(type_text, text_rect)
     
-    def _draw_pathfinding_controls(self, window: pygame.Surface, button_x: int,
-                                 y_offset: int, app_state: Dict[str, Any]) -> int:
+    def _draw_pathfinding_controls(self, surface: pygame.Surface, app_state: AppState) -> None:
 
-        is_pathfinding = app_state['is_pathfinding_in_progress']
-        is_paused = app_state['pathfinding_paused']
-        can_start = app_state['can_start_pathfinding']
+        is_pathfinding = app_state.is_pathfinding_in_progress
+        is_paused = app_state.pathfinding_paused
+        can_start = app_state.can_start_pathfinding
         
         # Determine button text and color
         if is_pathfinding:
@@ -134,34 +197,28 @@ class UIManager:
             path_text_str = "Find Shortest Path"
             path_enabled = False
         
-        path_rect = pygame.Rect(button_x, y_offset, BUTTON_WIDTH, BUTTON_HEIGHT)
-        self.button_positions['find_path'] = (path_rect, path_enabled)
+        path_rect = self._find_path_rect
+        self._buttons.append((path_rect, path_enabled, ("toggle_pathfinding", None)))
         
-        pygame.draw.rect(window, path_color, path_rect)
-        pygame.draw.rect(window, ACCENT if path_enabled else BG_DARK, path_rect, 2)
+        pygame.draw.rect(surface, path_color, path_rect)
+        pygame.draw.rect(surface, ACCENT if path_enabled else BG_DARK, path_rect, 2)
         
         text_color = TEXT_PRIMARY if path_enabled else TEXT_SECONDARY
-        path_text = self.font.render(path_text_str, True, text_color)
+        path_text = self._labels[path_text_str, text_color]
         text_rect = path_text.get_rect(center=path_rect.center)
-        window.blit(path_text, text_rect)
-        
-        return y_offset + BUTTON_HEIGHT + BUTTON_MARGIN
+        surface.blit(path_text, text_rect)
     
-    def _draw_speed_controls(self, window: pygame.Surface, button_x: int,
-                           y_offset: int, app_state: Dict[str, Any]) -> int:
+    def _draw_speed_controls(self, surface: pygame.Surface, app_state: AppState) -> None:
 
-        current_speed = app_state['speed']
-        is_pathfinding = app_state['is_pathfinding_in_progress']
+        current_speed = app_state.speed
+        is_pathfinding = app_state.is_pathfinding_in_progress
         
-        speed_text = self.font.render("Pathfinding Speed:", True, TEXT_PRIMARY)
-        window.blit(speed_text, (button_x, y_offset))
-        y_offset += 25
+        surface.blit(self._speed_heading_surface, self._speed_heading_pos)
         
         speeds = [("Normal", NORMAL_SPEED), ("Fast", FAST_SPEED), ("Instant", INSTANT_SPEED)]
-        self.button_positions['speeds'] = []
         speed_enabled = not is_pathfinding
         
-        for i, (name, speed_val) in enumerate(speeds):
+        for (name, speed_val), speed_rect in zip(speeds, self._speed_rects):
             if speed_enabled and abs(current_speed - speed_val) < 0.001:
                 color = BUTTON_ACTIVE
             elif speed_enabled:
@@ -169,125 +226,95 @@ class UIManager:
             else:
                 color = BUTTON_DISABLED
                 
-            speed_rect = pygame.Rect(button_x + i * 55, y_offset, 50, 30)
-            self.button_positions['speeds'].append((speed_rect, speed_val, speed_enabled))
+            self._buttons.append((speed_rect, speed_enabled, ("set_speed", speed_val)))
             
-            pygame.draw.rect(window, color, speed_rect)
-            pygame.draw.rect(window, BG_DARK, speed_rect, 1)
+            pygame.draw.rect(surface, color, speed_rect)
+            pygame.draw.rect(surface, BG_DARK, speed_rect, 1)
             
             text_color = TEXT_PRIMARY if speed_enabled else TEXT_SECONDARY
-            speed_label = pygame.font.SysFont('arial', 12).render(name, True, text_color)
+            speed_label = self._labels[name, text_color]
             text_rect = speed_label.get_rect(center=speed_rect.center)
-            window.blit(speed_label, text_rect)
-            
-        return y_offset + 40
+            surface.blit(speed_label, text_rect)
     
-    def _draw_clear_controls(self, window: pygame.Surface, button_x: int,
-                           y_offset: int, app_state: Dict[str, Any]) -> int:
+    def _draw_clear_controls(self, surface: pygame.Surface, app_state: AppState) -> None:
 
-        clear_enabled = app_state['can_interact_with_grid']
+        clear_enabled = app_state.can_interact_with_grid
         
         # Clear Path button
         clear_path_color = STATUS_WARNING if clear_enabled else BUTTON_DISABLED
-        clear_path_rect = pygame.Rect(button_x, y_offset, BUTTON_WIDTH, BUTTON_HEIGHT)
-        self.button_positions['clear_path'] = (clear_path_rect, clear_enabled)
+        clear_path_rect = self._clear_path_rect
+        self._buttons.append((clear_path_rect, clear_enabled, ("clear_path", None)))
         
-        pygame.draw.rect(window, clear_path_color, clear_path_rect)
-        pygame.draw.rect(window, ACCENT if clear_enabled else BG_DARK, clear_path_rect, 2)
+        pygame.draw.rect(surface, clear_path_color, clear_path_rect)
+        pygame.draw.rect(surface, ACCENT if clear_enabled else BG_DARK, clear_path_rect, 2)
         
         text_color = BG_LIGHT if clear_enabled else TEXT_SECONDARY
-        clear_path_text = self.font.render("Clear Path", True, text_color)
+        clear_path_text = self._labels["Clear Path", text_color]
         text_rect = clear_path_text.get_rect(center=clear_path_rect.center)
-        window.blit(clear_path_text, text_rect)
-        
-        y_offset += BUTTON_HEIGHT + BUTTON_MARGIN
+        surface.blit(clear_path_text, text_rect)
         
         # Clear All button
         clear_all_color = STATUS_ERROR if clear_enabled else BUTTON_DISABLED
-        clear_all_rect = pygame.Rect(button_x, y_offset, BUTTON_WIDTH, BUTTON_HEIGHT)
-        self.button_positions['clear_all'] = (clear_all_rect, clear_enabled)
+        clear_all_rect = self._clear_all_rect
+        self._buttons.append((clear_all_rect, clear_enabled, ("clear_all", None)))
         
-        pygame.draw.rect(window, clear_all_color, clear_all_rect)
-        pygame.draw.rect(window, ACCENT if clear_enabled else BG_DARK, clear_all_rect, 2)
+        pygame.draw.rect(surface, clear_all_color, clear_all_rect)
+        pygame.draw.rect(surface, ACCENT if clear_enabled else BG_DARK, clear_all_rect, 2)
         
         text_color = TEXT_PRIMARY if clear_enabled else TEXT_SECONDARY
-        clear_all_text = self.font.render("Clear All", True, text_color)
+        clear_all_text = self._labels["Clear All", text_color]
         text_rect = clear_all_text.get_rect(center=clear_all_rect.center)
-        window.blit(clear_all_text, text_rect)
-        
-        return y_offset + BUTTON_HEIGHT + BUTTON_MARGIN * 2
+        surface.blit(clear_all_text, text_rect)
     
-    def _draw_status_info(self, window: pygame.Surface, button_x: int,
-                         y_offset: int, app_state: Dict[str, Any]) -> None:
+    def _draw_status_info(self, surface: pygame.Surface, app_state: AppState) -> None:
 
-        last_path_length = app_state['last_path_length']
-        current_state = app_state['state']
-        is_pathfinding = app_state['is_pathfinding_in_progress']
-        is_paused = app_state['pathfinding_paused']
+        last_path_length = app_state.last_path_length
+        current_state = app_state.state
+        is_pathfinding = app_state.is_pathfinding_in_progress
+        is_paused = app_state.pathfinding_paused
+        
+        x, y_offset = self._status_pos
         
         # Path length display
         if last_path_length > 0:
-            path_info = self.font.render(f"Path Length: {last_path_length}", True, TEXT_PRIMARY)
-            window.blit(path_info, (button_x, y_offset))
+            path_info = self._get_text(f"Path Length: {last_path_length}", TEXT_PRIMARY)
+            surface.blit(path_info, (x, y_offset))
             y_offset += 25
         
         # Status message
-        state_messages = {
-            "WAITING_START": "Click to set START point",
-            "WAITING_END": "Click to set END point", 
-            "READY": "Ready to find path!",
-            "PATHFINDING": "Finding path..." if not is_paused else "Path finding PAUSED"
-        }
+        if current_state == State.PATHFINDING and is_paused:
+            status_message = "Path finding PAUSED"
+        else:
+            status_message = STATE_MESSAGES[current_state]
         
         status_color = TEXT_PRIMARY
         if is_pathfinding:
             status_color = STATUS_WARNING if is_paused else STATUS_SUCCESS
-        elif current_state == "READY":
+        elif current_state == State.READY:
             status_color = STATUS_SUCCESS
             
-        status_text = self.font.render(state_messages.get(current_state, ""), True, status_color)
-        window.blit(status_text, (button_x, y_offset))
+        status_text = self._get_text(status_message, status_color)
+        surface.blit(status_text, (x, y_offset))
+    
+    def _get_text(self, text: str, color: Tuple[int, int, int]) -> pygame.Surface:
+        key = (text, color)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            surface = self._text_cache[key] = self.font.render(text, True, color).convert_alpha()
+        return surface
     
     def handle_ui_click(self, pos: Tuple[int, int]) -> Tuple[str, Any]:
         x, y = pos
         
-        # Only handle clicks in UI area
-        if x < GRID_COLS * CELL_SIZE:
+        # Only handle clicks in UI area; buttons are stored in panel-local coordinates
+        if x < self.panel_rect.x:
             return None, None
+        x -= self.panel_rect.x
             
-        try:
-            # Check Generate Walls button
-            wall_rect, wall_enabled = self.button_positions['generate_wall']
-            if wall_rect.collidepoint(x, y) and wall_enabled:
-                return "generate_walls", None
-            
-            # Check Wall Type buttons
-            for type_rect, wall_key, type_enabled in self.button_positions['wall_types']:
-                if type_rect.collidepoint(x, y) and type_enabled:
-                    return "set_wall_type", wall_key
-            
-            # Check Find Path button
-            path_rect, path_enabled = self.button_positions['find_path']
-            if path_rect.collidepoint(x, y) and path_enabled:
-                return "toggle_pathfinding", None
-            
-            # Check Speed buttons
-            for speed_rect, speed_val, speed_enabled in self.button_positions['speeds']:
-                if speed_rect.collidepoint(x, y) and speed_enabled:
-                    return "set_speed", speed_val
-            
-            # Check Clear Path button
-            clear_path_rect, clear_enabled = self.button_positions['clear_path']
-            if clear_path_rect.collidepoint(x, y) and clear_enabled:
-                return "clear_path", None
-            
-            # Check Clear All button
-            clear_all_rect, clear_all_enabled = self.button_positions['clear_all']
-            if clear_all_rect.collidepoint(x, y) and clear_all_enabled:
-                return "clear_all", None
-                
-        except (KeyError, ValueError):
-            # Handle cases where button_positions might not be fully initialized
-            pass
+        index = pygame.Rect(x, y, 1, 1).collidelist(self._button_rects)
+        if index >= 0:
+            _, enabled, action = self._buttons[index]
+            if enabled:
+                return action
             
         return None, None
\ No newline at end of file
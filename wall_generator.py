@@ -1,15 +1,21 @@
-import random
+from itertools import permutations
+import numpy as np
 from grid import Grid
+from constants import *
+
+# 2-cell steps between maze cells: (dx, dy)
+_MAZE_STEPS = ((0, 2), (2, 0), (0, -2), (-2, 0))
+# Every visiting order of those steps; each maze cell draws one when it is first reached
+_MAZE_STEP_ORDERS = tuple(permutations(_MAZE_STEPS))
 
 class WallGenerator:
     @staticmethod
     def generate_wall(grid: Grid, maze_type: str = 'maze') -> None:
 
         # First, reset the entire grid and convert all cells into walls.
-        for row_list in grid.grid:
-            for node in row_list:
-                node.reset()
-                node.make_wall()
+        grid.clear_all()
+        grid.is_wall.fill(True)
+        grid.state.fill(STATE_WALL)
 
         if maze_type == 'maze':
             WallGenerator._recursive_backtracker(grid)
@@ -20,11 +26,10 @@ class WallGenerator:
 
     @staticmethod
     def _recursive_backtracker(grid: Grid) -> None:
-        visited = set()
-        stack = []
+        rows, cols = grid.rows, grid.cols
 
-        start_row = len(grid.grid) // 2
-        start_col = len(grid.grid[0]) // 2
+        start_row = rows // 2
+        start_col = cols // 2
 
         # Adjust to ensure starting on an odd row/column for maze generation.
         if start_row % 2 == 0:
@@ -32,60 +37,55 @@ class WallGenerator:
         if start_col % 2 == 0:
             start_col -= 1
 
-        stack.append((start_row, start_col))
+        # Carve into a flat bytearray (1 = passage, which doubles as the visited set)
+        # and write the result into the grid's arrays once at the end.
+        passages = bytearray(rows * cols)
+        passages[start_row * cols + start_col] = 1
+        # Draw every cell's step order up front from np.random, the generator's only RNG,
+        # one pick per odd-coordinate maze cell; cells take them in the order they are reached.
+        maze_cells = len(range(1, rows - 1, 2)) * len(range(1, cols - 1, 2))
+        order_picks = np.random.randint(len(_MAZE_STEP_ORDERS), size=maze_cells)
+        next_order = iter(order_picks.tolist()).__next__
+        # Each stack entry carries an iterator over that cell's shuffled step order, so
+        # returning to a cell resumes where it left off instead of rebuilding a neighbor list.
+        stack = [(start_row, start_col, iter(_MAZE_STEP_ORDERS[next_order()]))]
+        # Exclusive bounds that keep carving off the outer border
+        row_limit, col_limit = rows - 1, cols - 1
 
         while stack:
-            current_row, current_col = stack[-1]
-
-            if (current_row, current_col) not in visited:
-                visited.add((current_row, current_col))
-                node = grid.get_node(current_row, current_col)
-                if node:
-                    node.reset()
-
-            # Find unvisited neighbors that are two cells away in cardinal directions.
-            neighbors = []
-            # Define directions for 2-cell steps: (dx, dy)
-            directions = [(0, 2), (2, 0), (0, -2), (-2, 0)]
+            current_row, current_col, steps = stack[-1]
 
-            for dx, dy in directions:
+            # Take the next unvisited neighbor two cells away, staying off the outer border.
+            for dx, dy in steps:
                 new_row, new_col = current_row + dx, current_col + dy
-                # Check bounds: ensure neighbors are within the grid and not on the outer border
-                if (1 <= new_row < len(grid.grid) - 1 and # Avoid top/bottom border row 0, max_row-1
-                    1 <= new_col < len(grid.grid[0]) - 1 and # Avoid left/right border col 0, max_col-1
-                    (new_row, new_col) not in visited):
-                    neighbors.append((new_row, new_col, dx, dy))
-
-            if neighbors:
-                new_row, new_col, dx, dy = random.choice(neighbors)
-
-                wall_row = current_row + dx // 2
-                wall_col = current_col + dy // 2
-                wall_node = grid.get_node(wall_row, wall_col)
-                if wall_node:
-                    wall_node.reset()
-
-                stack.append((new_row, new_col))
+                if (1 <= new_row < row_limit and 1 <= new_col < col_limit and
+                        not passages[new_row * cols + new_col]):
+                    # Open the wall between the two cells, then the new cell itself
+                    passages[(current_row + new_row) // 2 * cols + (current_col + new_col) // 2] = 1
+                    passages[new_row * cols + new_col] = 1
+                    stack.append((new_row, new_col, iter(_MAZE_STEP_ORDERS[next_order()])))
+                    break
             else:
                 stack.pop()
 
+        open_cells = np.frombuffer(passages, dtype=bool).reshape(rows, cols)
+        grid.is_wall[open_cells] = False
+        grid.state[open_cells] = STATE_DEFAULT
+
     @staticmethod
     def _random_maze(grid: Grid) -> None:
-        for row in range(len(grid.grid)):
-            for col in range(len(grid.grid[0])):
-                if random.random() < 0.3:
-                    grid.get_node(row, col).make_wall()
-                else:
-                    grid.get_node(row, col).reset()
+        # Each cell is a wall with 30% probability, drawn for the whole grid in one call.
+        walls = np.random.random((grid.rows, grid.cols)) < 0.3
+        grid.is_wall[:] = walls
+        grid.state[:] = np.where(walls, STATE_WALL, STATE_DEFAULT)
 
     @staticmethod
     def _add_openings(grid: Grid) -> None:
-        num_openings = (len(grid.grid) ** 2) // 4
-
-        for _ in range(num_openings):
-            row = random.randrange(1, len(grid.grid) - 1)
-            col = random.randrange(1, len(grid.grid[0]) - 1)
-
-            node = grid.get_node(row, col)
-            if node and node.is_wall:
-                node.reset()
\ No newline at end of file
+        rows, cols = grid.rows, grid.cols
+        num_openings = (rows ** 2) // 4
+
+        # Knock out random interior cells in one draw; cells that are already open stay open.
+        opening_rows = np.random.randint(1, rows - 1, size=num_openings)
+        opening_cols = np.random.randint(1, cols - 1, size=num_openings)
+        grid.is_wall[opening_rows, opening_cols] = False
+        grid.state[opening_rows, opening_cols] = STATE_DEFAULT